@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from datetime import datetime
 import enum
 import functools
@@ -50,6 +51,11 @@ class RecognitionService:
             os.environ['DD_RECOGNITION_TASKS_TABLE'])
         self._ddb_cache_table = None
 
+        # Used to overlap independent AWS calls. Every background call is
+        # waited for before `process_blob` returns, so each table resource
+        # is only used by one thread at a time
+        self._io_executor = ThreadPoolExecutor(max_workers=2)
+
     def create_blob(self, callback_url: str = None,
                     allow_insecure_callback: bool = False) -> tuple[str, dict]:
         ''' Generates a random blob id, pre-signed S3 upload URL for recognition
@@ -159,6 +165,25 @@ class RecognitionService:
                 return True
         return False
 
+    def _wait_background(self, futures: list[Future]) -> Exception | None:
+        ''' Waits for the background calls to finish.
+
+        Every error raised by the calls is logged, so that none of them is
+        lost if the caller is already handling another exception.
+
+        Args:
+            futures: futures of the submitted background calls.
+
+        Returns:
+            Exception | None: the first error raised by the calls, or `None`
+                if all of them succeeded
+        '''
+        wait(futures)
+        errors = [e for e in (f.exception() for f in futures) if e is not None]
+        for e in errors:
+            logger.error("Background call failed: %s", e)
+        return errors[0] if errors else None
+
     def process_blob(self, blob_id: str, bucket: str, etag: str) -> None:
         ''' Handles the uploaded blob
 
@@ -207,15 +232,33 @@ class RecognitionService:
                 'Bucket': bucket,
                 'Name': blob_id}})['Labels']
 
-            # Save result to the recognition table
-            self._update_status(blob_id, STATUS_RECOGNITION_FINISHED,
-                                result=json.dumps(result))
-            # Save result to the cache
-            self._ddb_cache_table.put_item(Item={'etag': etag,
-                                                 'timestamp': timestamp,
-                                                 'result': json.dumps(result)})
-            # Delete recognized blob
-            self._s3.delete_object(Bucket=bucket, Key=blob_id)
+            result = json.dumps(result)
+
+            # Save result to the cache and delete recognized blob in the
+            # background, so that the status update (which triggers the
+            # callback) is not delayed by them.
+            #
+            # Note: these calls don't depend on the status update. The cache
+            # is written and the blob is deleted even if the status update
+            # fails (the task is then marked as failed), as the labels are
+            # still a valid recognition result for the file.
+            pending = [
+                self._io_executor.submit(
+                    self._ddb_cache_table.put_item, Item={
+                        'etag': etag,
+                        'timestamp': timestamp,
+                        'result': result}),
+                self._io_executor.submit(
+                    self._s3.delete_object, Bucket=bucket, Key=blob_id)]
+            try:
+                # Save result to the recognition table
+                self._update_status(blob_id, STATUS_RECOGNITION_FINISHED,
+                                    result=result)
+            finally:
+                background_error = self._wait_background(pending)
+            # Background errors are handled the same way as before
+            if background_error is not None:
+                raise background_error
             return
 
         except (self._rekognition.exceptions.InvalidImageFormatException,
@@ -234,13 +277,20 @@ class RecognitionService:
             error = '500 Internal server error'
 
         if error is not None:
-            self._update_status(
-                blob_id, STATUS_RECOGNITION_FAILED, error=error)
+            pending = []
             if should_cache_error:
-                self._ddb_cache_table.put_item(Item={
-                    'etag': etag,
-                    'timestamp': timestamp,
-                    'error': error})
+                pending.append(self._io_executor.submit(
+                    self._ddb_cache_table.put_item, Item={
+                        'etag': etag,
+                        'timestamp': timestamp,
+                        'error': error}))
+            try:
+                self._update_status(
+                    blob_id, STATUS_RECOGNITION_FAILED, error=error)
+            finally:
+                background_error = self._wait_background(pending)
+            if background_error is not None:
+                raise background_error
 
     def call_back(self, blob_id: str, callback_url: str, status: str,
                   result: str = None, error: str = None,
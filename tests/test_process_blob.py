@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import io
+import os
+import pathlib
+import sys
+import time
+
+import pytest
+from botocore.exceptions import ClientError
+
+# recognition.py reads its settings and creates boto3 clients on import
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ.setdefault('DD_RECOGNITION_TASKS_TABLE', 'recognition_tasks')
+os.environ.setdefault('DD_RECOGNITION_CACHE_TABLE', 'recognition_cache')
+os.environ.setdefault('RECOGNITION_CACHE_LIFETIME', '86400')
+os.environ.setdefault('RECOGNITION_CALLBACK_TIMEOUT', '5')
+os.environ.setdefault('REKOGNITION_API_MAX_FILE_SIZE', '15000000')
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent.absolute()))
+
+import recognition  # noqa: E402
+
+
+def client_error(operation: str) -> ClientError:
+    return ClientError({'Error': {'Code': 'InternalServerError'}}, operation)
+
+
+class StubTable:
+    """ Records the calls made to a DynamoDB table """
+
+    def __init__(self):
+        self.updates = []
+        self.puts = []
+        self.fail_update_status = None
+        self.fail_put = False
+        self.put_delay = 0
+        self.update_delay = 0
+
+    def get_item(self, Key):
+        return {}
+
+    def update_item(self, Key, UpdateExpression, ExpressionAttributeNames,
+                    ExpressionAttributeValues):
+        time.sleep(self.update_delay)
+        status = ExpressionAttributeValues[':s']
+        if status == self.fail_update_status:
+            self.fail_update_status = None
+            raise client_error('UpdateItem')
+        self.updates.append(ExpressionAttributeValues)
+
+    def put_item(self, Item):
+        time.sleep(self.put_delay)
+        if self.fail_put:
+            raise client_error('PutItem')
+        self.puts.append(Item)
+
+
+class StubDynamoDB:
+    def __init__(self):
+        self.tables = {}
+
+    def Table(self, name):
+        return self.tables.setdefault(name, StubTable())
+
+
+class StubS3:
+    def __init__(self, content: bytes):
+        self.content = content
+        self.deleted = []
+        self.delete_delay = 0
+
+    def get_object(self, Bucket, Key, Range):
+        if Range.startswith('bytes=-'):
+            data = self.content[-int(Range[len('bytes=-'):]):]
+        else:
+            start, end = Range[len('bytes='):].split('-')
+            data = self.content[int(start):int(end) + 1]
+        return {'Body': io.BytesIO(data)}
+
+    def delete_object(self, Bucket, Key):
+        time.sleep(self.delete_delay)
+        self.deleted.append(Key)
+
+
+class StubRekognition:
+    class exceptions:
+        class InvalidImageFormatException(Exception):
+            pass
+
+        class ImageTooLargeException(Exception):
+            pass
+
+        class ProvisionedThroughputExceededException(Exception):
+            pass
+
+        class ThrottlingException(Exception):
+            pass
+
+    def detect_labels(self, Image):
+        return {'Labels': [{'Name': 'Cat', 'Confidence': 99.0}]}
+
+
+@pytest.fixture
+def stubs():
+    s3 = StubS3(recognition.PNG_HEADER + b'\x00' * 16)
+    ddb = StubDynamoDB()
+    service = recognition.RecognitionService(s3, ddb, StubRekognition())
+    return (service, s3, ddb.Table(os.environ['DD_RECOGNITION_TASKS_TABLE']),
+            ddb.Table(os.environ['DD_RECOGNITION_CACHE_TABLE']))
+
+
+def test_process_blob_success(stubs):
+    service, s3, tasks, cache = stubs
+    service.process_blob('blob', 'bucket', 'etag')
+
+    assert [u[':s'] for u in tasks.updates] == [
+        recognition.STATUS_RECOGNITION_FINISHED]
+    assert len(cache.puts) == 1
+    assert cache.puts[0]['etag'] == 'etag'
+    assert 'result' in cache.puts[0]
+    assert s3.deleted == ['blob']
+
+
+def test_process_blob_cache_put_failure(stubs):
+    service, s3, tasks, cache = stubs
+    cache.fail_put = True
+    service.process_blob('blob', 'bucket', 'etag')
+
+    assert [u[':s'] for u in tasks.updates] == [
+        recognition.STATUS_RECOGNITION_FINISHED,
+        recognition.STATUS_RECOGNITION_FAILED]
+    assert tasks.updates[-1][':e'].startswith('500')
+    # The delete doesn't wait for the cache write
+    assert s3.deleted == ['blob']
+
+
+def test_process_blob_status_failure_awaits_background(stubs):
+    service, s3, tasks, cache = stubs
+    tasks.fail_update_status = recognition.STATUS_RECOGNITION_FINISHED
+    cache.put_delay = 0.2
+    service.process_blob('blob', 'bucket', 'etag')
+
+    # The background calls have finished before process_blob returned. They
+    # don't depend on the status update, so the (valid) result is still
+    # cached and the blob is deleted
+    assert len(cache.puts) == 1
+    assert 'result' in cache.puts[0]
+    assert s3.deleted == ['blob']
+    assert [u[':s'] for u in tasks.updates] == [
+        recognition.STATUS_RECOGNITION_FAILED]
+
+
+def test_process_blob_failure_status_failure_awaits_background(stubs):
+    service, s3, tasks, cache = stubs
+    s3.content = b'not an image'
+    tasks.fail_update_status = recognition.STATUS_RECOGNITION_FAILED
+    cache.put_delay = 0.2
+    with pytest.raises(ClientError):
+        service.process_blob('blob', 'bucket', 'etag')
+
+    assert len(cache.puts) == 1
+    assert cache.puts[0]['error'].startswith('415')
+
+
+def test_process_blob_overlaps_writes(stubs):
+    service, s3, tasks, cache = stubs
+    tasks.update_delay = cache.put_delay = s3.delete_delay = 0.3
+
+    started_at = time.monotonic()
+    service.process_blob('blob', 'bucket', 'etag')
+    elapsed = time.monotonic() - started_at
+
+    # Sequential calls would take 0.9s
+    assert elapsed < 0.6
+    assert len(tasks.updates) == 1
+    assert len(cache.puts) == 1
+    assert s3.deleted == ['blob']